@@ -0,0 +1,135 @@
+"""Peak-memory benchmark for loading output.json.
+
+Compares the peak traced allocation of ``json.load`` (the full raw object
+graph) against streaming the file into ``MunicipalityStore``, each in a
+fresh interpreter. The store's peak should track its own compact size
+rather than the size of the raw JSON objects. The UBS layer is also
+compared against the per-unit dicts that ``/api/ubs_data`` used to build,
+and the extra memory needed to stream that response from the store is
+reported.
+
+Usage:
+    python benchmarks/bench_load_memory.py [--data PATH] [--municipalities N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_data import write_dataset  # noqa: E402
+
+JSON_LOAD_SNIPPET = """
+import json, sys, tracemalloc
+tracemalloc.start()
+with open(sys.argv[1], "r", encoding="utf-8", errors="ignore") as file:
+    data = json.load(file)
+current, peak = tracemalloc.get_traced_memory()
+print(json.dumps({"retained": current, "peak": peak, "rows": len(data)}))
+"""
+
+UBS_DICTS_SNIPPET = """
+import json, sys, tracemalloc
+import main
+tracemalloc.start()
+ubs_data = []
+for item in main.iter_municipalities(sys.argv[1]):
+    for ubs in item.get("UBS", []):
+        ubs_data.append({
+            "cnes": str(ubs.get("CNES", "")),
+            "nome": str(ubs.get("NOME", "")),
+            "municipio": str(item.get("Nome_Município", "")),
+            "uf": str(item.get("Sigla_UF", "")),
+            "regiao": str(item.get("Regiao", "")),
+            "tipo_municipio": str(item.get("Tipo_2017", "")),
+            "latitude": float(str(ubs.get("LATITUDE", "0")).replace(",", ".")),
+            "longitude": float(str(ubs.get("LONGITUDE", "0")).replace(",", ".")),
+            "logradouro": str(ubs.get("LOGRADOURO", "")),
+            "bairro": str(ubs.get("BAIRRO", "")),
+        })
+    del item
+current, peak = tracemalloc.get_traced_memory()
+print(json.dumps({"retained": current, "peak": peak, "rows": len(ubs_data)}))
+"""
+
+STORE_SNIPPET = """
+import json, sys, tracemalloc
+import main
+tracemalloc.start()
+store = main.MunicipalityStore.from_file(sys.argv[1])
+current, peak = tracemalloc.get_traced_memory()
+tracemalloc.reset_peak()
+size = sum(len(chunk) for chunk in main.stream_array_response(store.ubs.iter_json(store)))
+after, serialize_peak = tracemalloc.get_traced_memory()
+print(json.dumps({
+    "retained": current, "peak": peak, "rows": len(store), "ubs_rows": len(store.ubs),
+    "retained_after_serialize": after, "serialize_peak": serialize_peak - after,
+    "ubs_json_size": size,
+}))
+"""
+
+
+def run_snippet(snippet, data_path):
+    """Run a snippet in a fresh interpreter and return its JSON output"""
+    result = subprocess.run(
+        [sys.executable, "-c", snippet, data_path],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def mebibytes(size):
+    return size / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="Existing output.json to measure")
+    parser.add_argument("--municipalities", type=int, default=5570)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = args.data or write_dataset(
+            os.path.join(tmp_dir, "output.json"), args.municipalities
+        )
+        file_size = os.path.getsize(data_path)
+        raw = run_snippet(JSON_LOAD_SNIPPET, data_path)
+        ubs_dicts = run_snippet(UBS_DICTS_SNIPPET, data_path)
+        store = run_snippet(STORE_SNIPPET, data_path)
+
+    print(f"file size:            {mebibytes(file_size):8.1f} MiB")
+    print(
+        f"json.load:            peak {mebibytes(raw['peak']):8.1f} MiB, "
+        f"retained {mebibytes(raw['retained']):8.1f} MiB ({raw['rows']} rows)"
+    )
+    print(
+        f"MunicipalityStore:    peak {mebibytes(store['peak']):8.1f} MiB, "
+        f"retained {mebibytes(store['retained']):8.1f} MiB ({store['rows']} rows, "
+        f"{store['ubs_rows']} UBS)"
+    )
+    print(
+        f"/api/ubs_data stream: peak {mebibytes(store['serialize_peak']):8.1f} MiB "
+        f"above the store, retained "
+        f"{mebibytes(store['retained_after_serialize']):8.1f} MiB after "
+        f"({mebibytes(store['ubs_json_size']):.1f} MiB of JSON)"
+    )
+    print(
+        f"UBS as dicts:         peak {mebibytes(ubs_dicts['peak']):8.1f} MiB, "
+        f"retained {mebibytes(ubs_dicts['retained']):8.1f} MiB "
+        f"({ubs_dicts['rows']} UBS)"
+    )
+    return 0 if store["peak"] < raw["peak"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
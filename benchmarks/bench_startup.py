@@ -0,0 +1,157 @@
+"""Cold-start benchmark for main.py.
+
+Spawns fresh interpreters, imports the Flask app and serves the lightweight
+routes (``/`` and ``/api/regions``) through the test client, recording how
+long a new worker takes to become ready.
+
+Each run is measured in two modes:
+
+* request path (``PRECOMPUTE_STATISTICS=0``): the benchmark fails when the
+  scientific stack (numpy, pandas, scipy, matplotlib, seaborn) gets imported
+  while serving those routes, which is what keeps worker startup fast;
+* production default (``PRECOMPUTE_STATISTICS=1``): the first data load also
+  starts the hypothesis-test warm-up on a background thread, which imports
+  numpy/scipy. The benchmark reports how long the worker takes to become
+  ready in that mode, the latency of a request served while the warm-up is
+  running, and when the warm-up finishes.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--max-seconds S]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_data import write_dataset  # noqa: E402
+
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "matplotlib", "seaborn"]
+
+COLD_START_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+client = main.app.test_client()
+assert client.get("/").status_code == 200
+assert client.get("/api/regions").status_code == 200
+served = time.perf_counter()
+heavy_loaded = [m for m in %r if m in sys.modules]
+assert client.get("/api/vaccine_coverage").status_code == 200
+second = time.perf_counter()
+# The warm-up worker runs jobs in order, so this returns once it is done
+main._background.submit(lambda: None).result()
+warmed = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "ready_seconds": served - start,
+    "second_request_seconds": second - served,
+    "warmed_seconds": warmed - start,
+    "heavy_loaded": heavy_loaded,
+}))
+""" % (HEAVY_MODULES,)
+
+HEAVY_IMPORT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import numpy, pandas, scipy.stats
+print(json.dumps({"import_seconds": time.perf_counter() - start}))
+"""
+
+
+def run_snippet(snippet, env=None):
+    """Run a snippet in a fresh interpreter and return its JSON output"""
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Fail if the median cold start exceeds this many seconds",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env.setdefault(
+            "DATA_PATH",
+            write_dataset(os.path.join(tmp_dir, "output.json"), municipalities=200),
+        )
+        modes = {}
+        for precompute in ("0", "1"):
+            env["PRECOMPUTE_STATISTICS"] = precompute
+            modes[precompute] = [
+                run_snippet(COLD_START_SNIPPET, env) for _ in range(args.runs)
+            ]
+    heavy_imports = [run_snippet(HEAVY_IMPORT_SNIPPET) for _ in range(args.runs)]
+
+    def median(runs, field):
+        return statistics.median(r[field] for r in runs)
+
+    request_path = modes["0"]
+    default = modes["1"]
+    heavy_median = median(heavy_imports, "import_seconds")
+
+    print("request path (PRECOMPUTE_STATISTICS=0), medians:")
+    print(
+        f"  import main:              {median(request_path, 'import_seconds') * 1000:8.1f} ms"
+    )
+    print(
+        f"  ready (/ + /api/regions): {median(request_path, 'ready_seconds') * 1000:8.1f} ms"
+    )
+    print(
+        f"  next request:             {median(request_path, 'second_request_seconds') * 1000:8.1f} ms"
+    )
+    print(f"  numpy+pandas+scipy:       {heavy_median * 1000:8.1f} ms (avoided)")
+    print("default (PRECOMPUTE_STATISTICS=1), medians:")
+    print(
+        f"  ready (/ + /api/regions): {median(default, 'ready_seconds') * 1000:8.1f} ms"
+    )
+    print(
+        f"  next request (warming):   "
+        f"{median(default, 'second_request_seconds') * 1000:8.1f} ms"
+    )
+    print(
+        f"  warm-up finished:         {median(default, 'warmed_seconds') * 1000:8.1f} ms"
+    )
+
+    failures = []
+    heavy_loaded = sorted({m for r in request_path for m in r["heavy_loaded"]})
+    if heavy_loaded:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy_loaded)}")
+    for name, runs in (("request path", request_path), ("default", default)):
+        ready_median = median(runs, "ready_seconds")
+        if args.max_seconds is not None and ready_median > args.max_seconds:
+            failures.append(
+                f"{name} cold start {ready_median:.3f}s exceeds limit of "
+                f"{args.max_seconds:.3f}s"
+            )
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Synthetic output.json generator used by the benchmarks.
+
+Produces records with the same shape as the real extract (municipality
+attributes, ``recortes``/``recortes_2anos`` and the UBS list) so the
+benchmarks can run without the real data file.
+"""
+
+import json
+import random
+
+REGIONS = {
+    "Norte": ["AC", "AM", "PA"],
+    "Nordeste": ["BA", "CE", "PE"],
+    "Centro-Oeste": ["GO", "MT"],
+    "Sudeste": ["MG", "SP", "RJ"],
+    "Sul": ["PR", "RS", "SC"],
+}
+
+TYPOLOGIES = [
+    "Urbano",
+    "RuralAdjacente",
+    "IntermediarioAdjacente",
+    "RuralRemoto",
+    "IntermediarioRemoto",
+    "Não classificado",
+]
+
+VACCINE_FIELDS = [
+    "BCG",
+    "DTP",
+    "Penta (DTP/HepB/Hib)",
+    "Polio Injetável (VIP)",
+    "Rotavírus",
+    "Tríplice Viral - 1° Dose",
+    "Tríplice Viral - 2° Dose",
+    "Varicela",
+]
+
+
+def _coverage(rng):
+    if rng.random() < 0.03:
+        return "#N/D"
+    return f"{rng.uniform(40, 130):.2f}".replace(".", ",") + "%"
+
+
+def make_municipality(index, rng, ubs_per_municipality=8):
+    """Build one municipality record in the output.json format"""
+    region = rng.choice(list(REGIONS))
+    recorte = {field: _coverage(rng) for field in VACCINE_FIELDS}
+    recorte["Faixa_Etaria"] = "2 anos"
+    return {
+        "Cod_IBGE": 1000000 + index,
+        "Nome_Município": f"Município {index}",
+        "Sigla_UF": rng.choice(REGIONS[region]),
+        "Regiao": region,
+        "Tipo_2017": rng.choice(TYPOLOGIES),
+        "Pop_Estimada_2024": f"{rng.randint(800, 2_000_000):,}".replace(",", "."),
+        "recortes": [dict(recorte, Faixa_Etaria=f"{age} anos") for age in range(1, 6)],
+        "recortes_2anos": [recorte] if rng.random() > 0.02 else [],
+        "UBS": [
+            {
+                "CNES": str(2000000 + index * 100 + unit),
+                "NOME": f"UBS {unit} de Município {index}",
+                "LOGRADOURO": f"Rua {rng.randint(1, 500)}",
+                "BAIRRO": f"Bairro {rng.randint(1, 40)}",
+                "LATITUDE": f"{rng.uniform(-33, 5):.6f}".replace(".", ","),
+                "LONGITUDE": f"{rng.uniform(-73, -35):.6f}".replace(".", ","),
+            }
+            for unit in range(rng.randint(1, ubs_per_municipality * 2))
+        ],
+    }
+
+
+def write_dataset(path, municipalities=5570, ubs_per_municipality=8, seed=42):
+    """Write a synthetic output.json with the given number of municipalities"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[\n")
+        for index in range(municipalities):
+            if index:
+                file.write(",\n")
+            record = make_municipality(index, rng, ubs_per_municipality)
+            json.dump(record, file, ensure_ascii=False, indent=2)
+        file.write("\n]\n")
+    return path
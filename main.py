@@ -3,16 +3,33 @@ import sys
 
 sys.path.insert(0, os.path.dirname(__file__))  # Updated path
 
+import hashlib
+import io
+import itertools
 import json
+import math
 import os
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from typing import Dict, List, Optional, Union
 
-import numpy as np
-import pandas as pd
-from flask import Flask, jsonify, render_template, request, send_from_directory
-from scipy import stats
+from flask import (
+    Flask,
+    jsonify,
+    render_template,
+    request,
+    send_from_directory,
+    url_for,
+)
+
+# numpy, pandas and scipy are imported inside the analytics helpers that use
+# them, so a fresh worker can serve the lightweight routes (index, filters,
+# summary) without paying for the scientific stack at startup.
 
 app = Flask(__name__)
 
@@ -60,15 +77,592 @@ def create_response(data: Union[Dict, List], message: Optional[str] = None) -> D
     return response_data
 
 
+def stream_array_response(items, message: Optional[str] = None, batch_size=1000):
+    """Stream a standardized API response whose data is a JSON array.
+
+    ``items`` yields already-encoded JSON values, which are sent in batches
+    so the full payload is never held in memory.
+    """
+    envelope = create_response([], message)
+    del envelope["data"]
+    # Keys are sorted like jsonify does, so "data" comes first
+    rest = json.dumps(envelope, sort_keys=True, separators=(",", ":"))
+
+    yield '{"data":['
+    separator = ""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield separator + ",".join(batch)
+            separator = ","
+            batch = []
+    if batch:
+        yield separator + ",".join(batch)
+    yield "]," + rest[1:] + "\n"
+
+
+DATA_PATH = os.getenv(
+    "DATA_PATH", os.path.join(os.path.dirname(__file__), "output.json")
+)
+
+VACCINE_MAPPING = {
+    "bcg": "BCG",
+    "dtp": "DTP",
+    "penta": "Penta (DTP/HepB/Hib)",
+    "polio": "Polio Injetável (VIP)",
+    "rotavirus": "Rotavírus",
+    "triplice_viral_1": "Tríplice Viral - 1° Dose",
+    "triplice_viral_2": "Tríplice Viral - 2° Dose",
+    "varicela": "Varicela",
+}
+
+TYPOLOGY_ORDER = [
+    "Urbano",
+    "RuralAdjacente",
+    "IntermediarioAdjacente",
+    "RuralRemoto",
+    "IntermediarioRemoto",
+]
+REGION_ORDER = ["Norte", "Nordeste", "Centro-Oeste", "Sudeste", "Sul"]
+VIEW_TYPES = ("typology", "region")
+
+
+def validate_analysis_args(selected_vaccine, view_type="typology"):
+    """Return an error message for unknown vaccine/view parameters, or None.
+
+    Request parameters become result-cache keys, so unknown values are
+    rejected up front instead of being computed and cached one by one.
+    """
+    if selected_vaccine != "all" and selected_vaccine not in VACCINE_MAPPING:
+        return f"Unknown vaccine: {selected_vaccine}"
+    if view_type not in VIEW_TYPES:
+        return f"Unknown view: {view_type}"
+    return None
+
+
+def iter_json_array(file, chunk_size=64 * 1024):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the element being decoded (plus one read chunk) is kept in memory,
+    so callers can consume arbitrarily large files record by record. Errors
+    report the character offset from the start of the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    offset = 0  # Position of buffer[0] in the whole file
+    eof = False
+    started = False
+    # What the array grammar allows next: "first" (a value or "]"), "value"
+    # (after a comma), "separator" (after a value: "," or "]") or "end"
+    # (after the closing "]": only whitespace)
+    expected = "first"
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                if expected == "end":
+                    return
+                raise ValueError(f"Unexpected end of JSON data at char {offset + pos}")
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, pos, offset = buffer[pos:] + chunk, 0, offset + pos
+            continue
+
+        char = buffer[pos]
+        if expected == "end":
+            raise ValueError(
+                f"Extra data after JSON array at char {offset + pos}: {char!r}"
+            )
+        elif not started:
+            if char != "[":
+                raise ValueError(
+                    f"Expected a top-level JSON array at char {offset + pos}"
+                )
+            started = True
+            pos += 1
+        elif expected == "separator":
+            if char == "]":
+                expected = "end"
+            elif char == ",":
+                expected = "value"
+            else:
+                raise ValueError(
+                    f"Expected ',' or ']' in JSON array at char {offset + pos}, "
+                    f"got {char!r}"
+                )
+            pos += 1
+        elif char == "]" and expected == "first":
+            expected = "end"
+            pos += 1
+        elif char in ",]":
+            raise ValueError(
+                f"Expected a value in JSON array at char {offset + pos}, "
+                f"got {char!r}"
+            )
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                end = None
+                if eof:
+                    raise ValueError(
+                        f"Invalid JSON value at char {offset + e.pos}: {e.msg}"
+                    ) from None
+            # A value is only complete once the delimiter after it has been
+            # read; otherwise it may be cut at the chunk edge (e.g. "12" of
+            # "12.5"), so read more and decode it again.
+            if end is not None and not eof:
+                delimiter = end
+                while delimiter < len(buffer) and buffer[delimiter] in " \t\r\n":
+                    delimiter += 1
+                if delimiter == len(buffer) or buffer[delimiter] not in ",]":
+                    end = None
+            if end is None:
+                chunk = file.read(max(chunk_size, len(buffer) - pos))
+                eof = not chunk
+                buffer, pos, offset = buffer[pos:] + chunk, 0, offset + pos
+                continue
+            yield item
+            pos = end
+            expected = "separator"
+
+
+def iter_municipalities(path=None):
+    """Stream the municipality records of output.json one at a time"""
+    with open(path or DATA_PATH, "r", encoding="utf-8", errors="ignore") as file:
+        yield from iter_json_array(file)
+
+
+def parse_population(value):
+    """Parse Pop_Estimada_2024 ("12.345" or 12345), returning NaN if invalid"""
+    try:
+        return float(str(value).replace(".", "").replace(",", ""))
+    except (ValueError, TypeError):
+        return math.nan
+
+
+CNES_WIDTH = 7
+
+
+def _float_json(value):
+    return float.__repr__(value) if math.isfinite(value) else json.dumps(value)
+
+
+class UbsStore:
+    """Columnar store of the UBS (basic health units) of every municipality.
+
+    Coordinates and CNES codes live in typed arrays, repeated address strings
+    are interned and each unit keeps only the row of its municipality, so
+    municipality attributes are stored once and shared by all of its units.
+    """
+
+    def __init__(self):
+        self.municipio_row = array("l")
+        self.cnes = array("q")
+        self.cnes_text = {}  # Row -> CNES that is not a 7-digit code
+        self.nome = []
+        self.logradouro = []
+        self.bairro = []
+        self.latitude = array("d")
+        self.longitude = array("d")
+
+    def __len__(self):
+        return len(self.nome)
+
+    def append(self, municipio_row, ubs):
+        """Ingest one raw UBS entry belonging to a municipality row"""
+        cnes = str(ubs.get("CNES", ""))
+        nome = str(ubs.get("NOME", ""))
+        logradouro = sys.intern(str(ubs.get("LOGRADOURO", "")))
+        bairro = sys.intern(str(ubs.get("BAIRRO", "")))
+
+        # Tratar casos onde as coordenadas são strings com vírgula ao invés de ponto
+        try:
+            latitude = float(str(ubs.get("LATITUDE", "0")).replace(",", "."))
+            longitude = float(str(ubs.get("LONGITUDE", "0")).replace(",", "."))
+        except (ValueError, AttributeError):
+            latitude = 0.0
+            longitude = 0.0
+
+        if len(cnes) == CNES_WIDTH and cnes.isascii() and cnes.isdigit():
+            self.cnes.append(int(cnes))
+        else:
+            self.cnes_text[len(self)] = cnes
+            self.cnes.append(-1)
+        self.municipio_row.append(municipio_row)
+        self.nome.append(nome)
+        self.logradouro.append(logradouro)
+        self.bairro.append(bairro)
+        self.latitude.append(latitude)
+        self.longitude.append(longitude)
+
+    def get_cnes(self, row):
+        """CNES code of a unit as it appeared in the source data"""
+        code = self.cnes[row]
+        return self.cnes_text[row] if code < 0 else f"{code:0{CNES_WIDTH}d}"
+
+    def iter_json(self, municipalities):
+        """Serialize each unit as a JSON object without building per-row dicts"""
+        encode = json.encoder.encode_basestring_ascii
+        municipality_row = None
+        municipality_json = None
+
+        for row in range(len(self)):
+            # Units are stored grouped by municipality, so each municipality's
+            # fields are encoded once and reused by all of its units.
+            if self.municipio_row[row] != municipality_row:
+                municipality_row = self.municipio_row[row]
+                municipality_json = (
+                    encode(municipalities.municipio[municipality_row]),
+                    encode(municipalities.regiao[municipality_row]),
+                    encode(municipalities.tipo[municipality_row]),
+                    encode(municipalities.uf[municipality_row]),
+                )
+
+            yield (
+                '{"bairro":%s,"cnes":%s,"latitude":%s,"logradouro":%s,'
+                '"longitude":%s,"municipio":%s,"nome":%s,"regiao":%s,'
+                '"tipo_municipio":%s,"uf":%s}'
+            ) % (
+                encode(self.bairro[row]),
+                encode(self.get_cnes(row)),
+                _float_json(self.latitude[row]),
+                encode(self.logradouro[row]),
+                _float_json(self.longitude[row]),
+                municipality_json[0],
+                encode(self.nome[row]),
+                municipality_json[1],
+                municipality_json[2],
+                municipality_json[3],
+            )
+
+
+class MunicipalityStore:
+    """Columnar, compact view of the municipality records in output.json.
+
+    Each municipality becomes one row; repeated strings (UF, region,
+    typology) are interned and numeric fields live in typed arrays, so the
+    raw dicts can be discarded as soon as they are ingested. Health units
+    are kept in ``ubs``, keyed by municipality row. Missing coverage values
+    read as 0.0 in ``coverage`` and are flagged in ``coverage_valid``.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.municipio = []
+        self.uf = []
+        self.regiao = []
+        self.tipo = []
+        self.populacao = array("d")
+        self.ubs_count = array("l")
+        self.latitude = array("d")
+        self.longitude = array("d")
+        self.has_recorte = array("b")
+        self.coverage = {vaccine: array("d") for vaccine in VACCINE_MAPPING}
+        self.coverage_valid = {vaccine: array("b") for vaccine in VACCINE_MAPPING}
+        self.ubs = UbsStore()
+
+    def __len__(self):
+        return len(self.municipio)
+
+    @classmethod
+    def from_file(cls, path=None, version=None):
+        """Build the store by streaming the JSON file record by record"""
+        store = cls(version)
+        for item in iter_municipalities(path):
+            try:
+                store.append(item)
+            except Exception as e:
+                print(f"Error processing item: {str(e)}")
+                continue
+        return store
+
+    def append(self, item):
+        """Ingest one raw municipality record.
+
+        Every field is parsed before any column is touched, so a malformed
+        record raises without leaving a partial row behind.
+        """
+        municipio = str(item.get("Nome_Município", ""))
+        uf = sys.intern(str(item.get("Sigla_UF", "")))
+        regiao = sys.intern(str(item.get("Regiao", "")))
+        tipo = sys.intern(str(item.get("Tipo_2017", "")))
+        populacao = parse_population(item.get("Pop_Estimada_2024", "0"))
+        ubs_count = len(item.get("UBS", []))
+
+        latitude = get_latitude(item)
+        longitude = get_longitude(item)
+
+        recortes = item.get("recortes_2anos")
+        recorte = recortes[0] if recortes else None
+        coverage = {
+            vaccine: (
+                get_vaccine_value(recorte, key, None) if recorte is not None else None
+            )
+            for vaccine, key in VACCINE_MAPPING.items()
+        }
+
+        row = len(self)
+        self.municipio.append(municipio)
+        self.uf.append(uf)
+        self.regiao.append(regiao)
+        self.tipo.append(tipo)
+        self.populacao.append(populacao)
+        self.ubs_count.append(ubs_count)
+        self.latitude.append(math.nan if latitude is None else latitude)
+        self.longitude.append(math.nan if longitude is None else longitude)
+        self.has_recorte.append(1 if recorte is not None else 0)
+        for vaccine, value in coverage.items():
+            if value is not None:
+                self.coverage[vaccine].append(value)
+            else:
+                self.coverage[vaccine].append(0.0 if recorte is not None else math.nan)
+            self.coverage_valid[vaccine].append(1 if value is not None else 0)
+
+        try:
+            for ubs in item.get("UBS", []):
+                self.ubs.append(row, ubs)
+        except Exception as e:
+            print(f"Error processing UBS item: {e}")
+
+    def rows_with_recorte(self):
+        """Row indices of municipalities that have 2-year coverage data"""
+        return [row for row, flag in enumerate(self.has_recorte) if flag]
+
+    def get_coverage(self, vaccine, row):
+        """Coverage for a vaccine at a row, or None if unavailable"""
+        if vaccine not in self.coverage or not self.has_recorte[row]:
+            return None
+        return self.coverage[vaccine][row]
+
+    def get_population(self, row):
+        """Population at a row, falling back to 0 when it could not be parsed"""
+        population = self.populacao[row]
+        return 0.0 if math.isnan(population) else population
+
+    @staticmethod
+    def optional(value):
+        """Convert a NaN placeholder back into None for serialization"""
+        return None if math.isnan(value) else value
+
+
+_store_lock = threading.Lock()
+_store = None
+
+
+def get_data_version(path=None):
+    """Identify the current contents of the data file by mtime and size"""
+    stat = os.stat(path or DATA_PATH)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_store_loads = {}  # Data version -> Future of the store being built
+_store_failures = {}  # Data version -> error of a load that failed
+_store_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reload")
+
+
+def _load_store(version):
+    global _store
+    try:
+        store = MunicipalityStore.from_file(DATA_PATH, version)
+    except Exception as e:
+        print(f"Error loading data version {version}: {e}")
+        with _store_lock:
+            _store_failures[version] = e
+        raise
+    else:
+        with _store_lock:
+            _store = store
+            _store_failures.clear()
+        if PRECOMPUTE_STATISTICS:
+            _background.submit(precompute_results)
+        return store
+    finally:
+        with _store_lock:
+            del _store_loads[version]
+
+
+def get_store():
+    """Return the municipality store, reloading it when output.json changes.
+
+    Each data version is parsed once, on a loader thread. While a reload
+    runs, requests keep being served from the previously loaded store, and
+    a version that failed to load is not retried until the file changes
+    again. Only the very first load is waited for, up to
+    RESULT_TIMEOUT_SECONDS.
+    """
+    version = get_data_version()
+    current = _store
+    if current is not None and current.version == version:
+        return current
+
+    with _store_lock:
+        failure = _store_failures.get(version)
+        future = _store_loads.get(version)
+        if failure is None and future is None:
+            future = _store_loads[version] = _store_loader.submit(_load_store, version)
+
+    if current is not None:
+        return current
+    if failure is not None:
+        raise ValueError(f"Data file could not be loaded: {failure}")
+    try:
+        return future.result(timeout=RESULT_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        raise TimeoutError("Timed out waiting for the data file to load")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single computation.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for its result (or exception) instead of
+    recomputing it.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        """Run func once per key; raise TimeoutError if waiting exceeds timeout"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for {key!r}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "64"))
+RESULT_TIMEOUT_SECONDS = float(os.getenv("RESULT_TIMEOUT_SECONDS", "30"))
+
+
+class ResultCache:
+    """Thread-safe LRU of computed results keyed by (key, data version)"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, cache_key, default=None):
+        with self._lock:
+            if cache_key not in self._entries:
+                return default
+            self._entries.move_to_end(cache_key)
+            return self._entries[cache_key]
+
+    def put(self, cache_key, result):
+        with self._lock:
+            self._entries[cache_key] = result
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def latest(self, key, default=None):
+        """Most recently used result for key from any data version"""
+        with self._lock:
+            for (cached_key, _version), result in reversed(self._entries.items()):
+                if cached_key == key:
+                    return result
+        return default
+
+
+_MISSING = object()
+_result_cache = ResultCache(RESULT_CACHE_SIZE)
+_result_flight = SingleFlight()
+
+
+def get_cached_result(key, compute, cache=None, store=None):
+    """Return compute(store) for the current data version, computed once.
+
+    Results are cached per (key, data version) in ``cache`` (the shared
+    result cache by default). Concurrent requests for the same missing entry
+    wait on a single computation; if that takes longer than
+    RESULT_TIMEOUT_SECONDS, the waiters fall back to the result for the same
+    key from an earlier data version, when one is still cached. Callers that
+    pass ``store`` need the result for that exact version and never fall back.
+    """
+    cache = _result_cache if cache is None else cache
+    pinned = store is not None
+    store = store if pinned else get_store()
+    cache_key = (key, store.version)
+    result = cache.get(cache_key, _MISSING)
+    if result is not _MISSING:
+        return result
+
+    def compute_and_cache():
+        result = compute(store)
+        cache.put(cache_key, result)
+        return result
+
+    try:
+        return _result_flight.do(cache_key, compute_and_cache, RESULT_TIMEOUT_SECONDS)
+    except TimeoutError:
+        result = _MISSING if pinned else cache.latest(key, _MISSING)
+        if result is not _MISSING:
+            return result
+        raise TimeoutError(f"Timed out waiting for {key[0]} to be computed")
+
+
+# Results that are too slow to compute on request are warmed up in a
+# background worker every time the data file is (re)loaded.
+PRECOMPUTE_STATISTICS = os.getenv("PRECOMPUTE_STATISTICS", "1") != "0"
+
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute")
+
+# Precomputed results live outside the shared LRU so that request traffic
+# can never evict them; two entries hold the current and previous version.
+_precomputed_results = ResultCache(2)
+
+
+def get_group_test_results():
+    """Hypothesis test results for the current data version"""
+    return get_cached_result(
+        ("group_tests",), compute_group_tests, _precomputed_results
+    )
+
+
+def precompute_results():
+    """Fill the precomputed results for the current data version"""
+    try:
+        get_group_test_results()
+    except Exception as e:
+        print(f"Error precomputing group tests: {e}")
+
+
 # Carregando os dados
 @app.route("/api/data")
 def get_data():
     try:
-        # Caminho para o arquivo JSON
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
         # Carregar os dados do JSON
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
+        with open(DATA_PATH, "r", encoding="utf-8", errors="ignore") as file:
             data = json.load(file)
 
         return jsonify(create_response(data))
@@ -113,12 +707,9 @@ Utilize os filtros e visualizações para explorar os dados em mais detalhes."""
 @app.route("/api/regions")
 def get_regions():
     try:
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
+        store = get_store()
 
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
-
-        regions = sorted(list(set(item["Regiao"] for item in data if "Regiao" in item)))
+        regions = sorted(set(region for region in store.regiao if region))
         return jsonify(create_response(regions))
     except Exception as e:
         print(f"Error in get_regions: {e}")
@@ -128,14 +719,9 @@ def get_regions():
 @app.route("/api/municipality_types")
 def get_municipality_types():
     try:
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
+        store = get_store()
 
-        types = sorted(
-            list(set(item["Tipo_2017"] for item in data if "Tipo_2017" in item))
-        )
+        types = sorted(set(mun_type for mun_type in store.tipo if mun_type))
         return jsonify(create_response(types))
     except Exception as e:
         print(f"Error in get_municipality_types: {e}")
@@ -145,59 +731,40 @@ def get_municipality_types():
 @app.route("/api/vaccine_coverage")
 def get_vaccine_coverage():
     try:
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
+        store = get_store()
 
         region = request.args.get("region")
         mun_type = request.args.get("type")
 
-        filtered_data = data
-        if region:
-            filtered_data = [
-                item for item in filtered_data if item.get("Regiao") == region
-            ]
-        if mun_type:
-            filtered_data = [
-                item for item in filtered_data if item.get("Tipo_2017") == mun_type
-            ]
-
         coverage_data = []
-        for item in filtered_data:
-            try:
-                if "recortes_2anos" in item and item["recortes_2anos"]:
-                    recorte = item["recortes_2anos"][0]
-                    coverage_item = VaccineCoverage(
-                        municipio=str(item.get("Nome_Município", "")),
-                        regiao=str(item.get("Regiao", "")),
-                        tipo=str(item.get("Tipo_2017", "")),
-                        uf=str(item.get("Sigla_UF", "")),
-                        bcg=get_vaccine_value(recorte, "BCG"),
-                        dtp=get_vaccine_value(recorte, "DTP"),
-                        penta=get_vaccine_value(recorte, "Penta (DTP/HepB/Hib)"),
-                        polio=get_vaccine_value(recorte, "Polio Injetável (VIP)"),
-                        rotavirus=get_vaccine_value(recorte, "Rotavírus"),
-                        triplice_viral_1=get_vaccine_value(
-                            recorte, "Tríplice Viral - 1° Dose"
-                        ),
-                        triplice_viral_2=get_vaccine_value(
-                            recorte, "Tríplice Viral - 2° Dose"
-                        ),
-                        varicela=get_vaccine_value(recorte, "Varicela"),
-                        latitude=get_latitude(item),
-                        longitude=get_longitude(item),
-                        ubs_count=len(item.get("UBS", [])),
-                        populacao=float(
-                            str(item.get("Pop_Estimada_2024", "0"))
-                            .replace(".", "")
-                            .replace(",", "")
-                        ),
-                    )
-                    coverage_data.append(asdict(coverage_item))
-            except Exception as e:
-                print(f"Error processing item: {str(e)}")
+        for row in store.rows_with_recorte():
+            if region and store.regiao[row] != region:
                 continue
+            if mun_type and store.tipo[row] != mun_type:
+                continue
+            # Municipalities with an unparseable population are left out
+            if math.isnan(store.populacao[row]):
+                continue
+
+            coverage_item = VaccineCoverage(
+                municipio=store.municipio[row],
+                regiao=store.regiao[row],
+                tipo=store.tipo[row],
+                uf=store.uf[row],
+                bcg=store.coverage["bcg"][row],
+                dtp=store.coverage["dtp"][row],
+                penta=store.coverage["penta"][row],
+                polio=store.coverage["polio"][row],
+                rotavirus=store.coverage["rotavirus"][row],
+                triplice_viral_1=store.coverage["triplice_viral_1"][row],
+                triplice_viral_2=store.coverage["triplice_viral_2"][row],
+                varicela=store.coverage["varicela"][row],
+                latitude=store.optional(store.latitude[row]),
+                longitude=store.optional(store.longitude[row]),
+                ubs_count=store.ubs_count[row],
+                populacao=store.populacao[row],
+            )
+            coverage_data.append(asdict(coverage_item))
 
         return jsonify(create_response(coverage_data))
     except Exception as e:
@@ -240,48 +807,13 @@ def get_vaccine_value(data_dict, key, default_value=0.0):
 @app.route("/api/ubs_data")
 def get_ubs_data():
     try:
-        # Caminho para o arquivo JSON
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
-        # Carregar os dados do JSON
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
-
-        # Extrair dados de UBS
-        ubs_data = []
-        for item in data:
-            try:
-                if "UBS" in item:
-                    for ubs in item["UBS"]:
-                        # Tratar casos onde as coordenadas são strings com vírgula ao invés de ponto
-                        lat_str = ubs.get("LATITUDE", "0")
-                        lon_str = ubs.get("LONGITUDE", "0")
-                        try:
-                            latitude = float(str(lat_str).replace(",", "."))
-                            longitude = float(str(lon_str).replace(",", "."))
-                        except (ValueError, AttributeError):
-                            latitude = 0.0
-                            longitude = 0.0
-
-                        ubs_data.append(
-                            {
-                                "cnes": str(ubs.get("CNES", "")),
-                                "nome": str(ubs.get("NOME", "")),
-                                "municipio": str(item.get("Nome_Município", "")),
-                                "uf": str(item.get("Sigla_UF", "")),
-                                "regiao": str(item.get("Regiao", "")),
-                                "tipo_municipio": str(item.get("Tipo_2017", "")),
-                                "latitude": latitude,
-                                "longitude": longitude,
-                                "logradouro": str(ubs.get("LOGRADOURO", "")),
-                                "bairro": str(ubs.get("BAIRRO", "")),
-                            }
-                        )
-            except Exception as e:
-                print(f"Error processing UBS item: {e}")
-                continue
+        store = get_store()
 
-        return jsonify(create_response(ubs_data))
+        # Serializado sob demanda, direto do armazenamento compacto
+        return app.response_class(
+            stream_array_response(store.ubs.iter_json(store)),
+            mimetype="application/json",
+        )
     except Exception as e:
         print(f"Error in ubs_data: {e}")
         return jsonify(create_response(None, str(e))), 500
@@ -290,18 +822,11 @@ def get_ubs_data():
 @app.route("/api/debug/recortes")
 def debug_recortes():
     try:
-        # Caminho para o arquivo JSON
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
-        # Carregar os dados do JSON
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
-
         # Look for an item with recortes_2anos
         sample_data = []
         field_names = set()
 
-        for item in data:
+        for item in iter_municipalities():
             if "recortes" in item and item["recortes"]:
                 sample_data.append({"recortes": item["recortes"][0]})
                 # Collect all field names from recortes
@@ -335,16 +860,9 @@ def debug_recortes():
 @app.route("/api/debug/first_item")
 def debug_first_item():
     try:
-        # Caminho para o arquivo JSON
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
-        # Carregar os dados do JSON
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
-
         # Get the first item with recortes_2anos
         first_item = None
-        for item in data:
+        for item in iter_municipalities():
             if "recortes_2anos" in item and item["recortes_2anos"]:
                 recorte = item["recortes_2anos"][0]
                 first_item = {
@@ -406,197 +924,166 @@ def get_typology_matrix():
         selected_vaccine = request.args.get("vaccine", "bcg")
         view_type = request.args.get("view", "typology")  # 'typology' or 'region'
 
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
+        error = validate_analysis_args(selected_vaccine, view_type)
+        if error:
+            return (
+                jsonify(create_response({"matrix_data": [], "metadata": {}}, error)),
+                400,
+            )
+
+        response_data = get_cached_result(
+            ("typology_matrix", selected_vaccine, view_type),
+            lambda store: build_typology_matrix(store, selected_vaccine, view_type),
+        )
+
+        return jsonify(create_response(response_data))
+    except TimeoutError as e:
+        print(f"Timeout in typology_matrix: {str(e)}")
+        return (
+            jsonify(create_response({"matrix_data": [], "metadata": {}}, str(e))),
+            503,
+        )
+    except Exception as e:
+        print(f"Error in typology_matrix: {str(e)}")
+        return (
+            jsonify(create_response({"matrix_data": [], "metadata": {}}, str(e))),
+            500,
+        )
 
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            raw_data = json.load(file)
 
-        # Process data for matrix visualization
-        matrix_data = []
-        typology_order = [
-            "Urbano",
-            "RuralAdjacente",
-            "IntermediarioAdjacente",
-            "RuralRemoto",
-            "IntermediarioRemoto",
-        ]
-        region_order = ["Norte", "Nordeste", "Centro-Oeste", "Sudeste", "Sul"]
-
-        vaccine_types = [
-            "bcg",
-            "dtp",
-            "penta",
-            "polio",
-            "rotavirus",
-            "triplice_viral_1",
-            "triplice_viral_2",
-            "varicela",
-        ]
+def build_typology_matrix(store, selected_vaccine, view_type):
+    """Aggregate coverage by typology or region for the matrix visualization"""
+    # Process data for matrix visualization
+    matrix_data = []
+    vaccine_types = list(VACCINE_MAPPING)
 
-        # Group data by selected category (typology or region)
-        category_groups = {}
+    # Group data by selected category (typology or region)
+    category_groups = {}
 
-        for item in raw_data:
-            if "recortes_2anos" not in item or not item["recortes_2anos"]:
+    for row in store.rows_with_recorte():
+        category = None
+        if view_type == "typology":
+            category = store.tipo[row]
+            if not category or category == "Não classificado":
+                continue
+        else:  # region view
+            category = store.regiao[row]
+            if not category:
                 continue
 
-            category = None
-            if view_type == "typology":
-                category = item.get("Tipo_2017")
-                if not category or category == "Não classificado":
-                    continue
-            else:  # region view
-                category = item.get("Regiao")
-                if not category:
-                    continue
-
-            if category not in category_groups:
-                category_groups[category] = {
-                    "coverage_sum": {v: 0.0 for v in vaccine_types},
-                    "count": {v: 0 for v in vaccine_types},
-                    "total_coverage": 0.0,  # For all vaccines average
-                    "total_count": 0,  # For all vaccines average
-                    "population": 0,
-                    "ubs_count": 0,
-                }
+        if category not in category_groups:
+            category_groups[category] = {
+                "coverage_sum": {v: 0.0 for v in vaccine_types},
+                "count": {v: 0 for v in vaccine_types},
+                "total_coverage": 0.0,  # For all vaccines average
+                "total_count": 0,  # For all vaccines average
+                "population": 0,
+                "ubs_count": 0,
+            }
 
-            recorte = item["recortes_2anos"][0]
-            try:
-                population = float(
-                    str(item.get("Pop_Estimada_2024", "0"))
-                    .replace(".", "")
-                    .replace(",", "")
-                )
-            except (ValueError, TypeError):
-                population = 0
-
-            ubs_count = len(item.get("UBS", []))
-
-            category_groups[category]["population"] += population
-            category_groups[category]["ubs_count"] += ubs_count
-
-            # Aggregate vaccine coverage data
-            valid_coverages = []
-            for vaccine in vaccine_types:
-                coverage = get_vaccine_coverage_value(recorte, vaccine)
-                if coverage is not None:
-                    category_groups[category]["coverage_sum"][vaccine] += coverage
-                    category_groups[category]["count"][vaccine] += 1
-                    valid_coverages.append(coverage)
-
-            # Calculate average for all vaccines
-            if valid_coverages:
-                category_groups[category]["total_coverage"] += sum(valid_coverages)
-                category_groups[category]["total_count"] += len(valid_coverages)
-
-        # Calculate averages and prepare matrix data
-        category_list = typology_order if view_type == "typology" else region_order
-        for category in category_list:
-            if category in category_groups:
-                data = category_groups[category]
-
-                if selected_vaccine == "all":
-                    # Calculate average across all vaccines
-                    if data["total_count"] > 0:
-                        avg_coverage = data["total_coverage"] / data["total_count"]
+        population = store.get_population(row)
+        ubs_count = store.ubs_count[row]
+
+        category_groups[category]["population"] += population
+        category_groups[category]["ubs_count"] += ubs_count
+
+        # Aggregate vaccine coverage data
+        valid_coverages = []
+        for vaccine in vaccine_types:
+            coverage = store.get_coverage(vaccine, row)
+            if coverage is not None:
+                category_groups[category]["coverage_sum"][vaccine] += coverage
+                category_groups[category]["count"][vaccine] += 1
+                valid_coverages.append(coverage)
+
+        # Calculate average for all vaccines
+        if valid_coverages:
+            category_groups[category]["total_coverage"] += sum(valid_coverages)
+            category_groups[category]["total_count"] += len(valid_coverages)
+
+    # Calculate averages and prepare matrix data
+    category_list = TYPOLOGY_ORDER if view_type == "typology" else REGION_ORDER
+    for category in category_list:
+        if category in category_groups:
+            data = category_groups[category]
+
+            if selected_vaccine == "all":
+                # Calculate average across all vaccines
+                if data["total_count"] > 0:
+                    avg_coverage = data["total_coverage"] / data["total_count"]
+                    matrix_data.append(
+                        {
+                            "category": category,
+                            "vaccine_type": "all",
+                            "coverage_rate": round(avg_coverage, 2),
+                            "population": int(data["population"]),
+                            "ubs_count": data["ubs_count"],
+                        }
+                    )
+            else:
+                # Individual vaccine data
+                for vaccine in vaccine_types:
+                    count = data["count"][vaccine]
+                    if count > 0:
+                        avg_coverage = data["coverage_sum"][vaccine] / count
                         matrix_data.append(
                             {
                                 "category": category,
-                                "vaccine_type": "all",
+                                "vaccine_type": vaccine,
                                 "coverage_rate": round(avg_coverage, 2),
                                 "population": int(data["population"]),
                                 "ubs_count": data["ubs_count"],
                             }
                         )
-                else:
-                    # Individual vaccine data
-                    for vaccine in vaccine_types:
-                        count = data["count"][vaccine]
-                        if count > 0:
-                            avg_coverage = data["coverage_sum"][vaccine] / count
-                            matrix_data.append(
-                                {
-                                    "category": category,
-                                    "vaccine_type": vaccine,
-                                    "coverage_rate": round(avg_coverage, 2),
-                                    "population": int(data["population"]),
-                                    "ubs_count": data["ubs_count"],
-                                }
-                            )
-
-        # Calculate correlation matrix for the selected vaccine
-        correlation_data = calculate_correlation_matrix(raw_data, selected_vaccine)
-
-        response_data = {
-            "matrix_data": matrix_data,
-            "metadata": {
-                "categories": category_list,
-                "vaccine_types": (
-                    ["all"] if selected_vaccine == "all" else vaccine_types
-                ),
-                "view_type": view_type,
-                "statistics": {
-                    "correlations": correlation_data,
-                    "summaries": calculate_summaries(category_groups, vaccine_types),
-                },
+
+    # Calculate correlation matrix for the selected vaccine
+    correlation_data = calculate_correlation_matrix(store, selected_vaccine)
+
+    response_data = {
+        "matrix_data": matrix_data,
+        "metadata": {
+            "categories": category_list,
+            "vaccine_types": (["all"] if selected_vaccine == "all" else vaccine_types),
+            "view_type": view_type,
+            "statistics": {
+                "correlations": correlation_data,
+                "summaries": calculate_summaries(category_groups, vaccine_types),
             },
-        }
+        },
+    }
 
-        return jsonify(create_response(response_data))
-    except Exception as e:
-        print(f"Error in typology_matrix: {str(e)}")
-        return (
-            jsonify(create_response({"matrix_data": [], "metadata": {}}, str(e))),
-            500,
-        )
+    return response_data
 
 
 def get_vaccine_coverage_value(recorte, vaccine_type):
     """Helper function to get vaccine coverage value from recorte data"""
-    vaccine_mapping = {
-        "bcg": "BCG",
-        "dtp": "DTP",
-        "penta": "Penta (DTP/HepB/Hib)",
-        "polio": "Polio Injetável (VIP)",
-        "rotavirus": "Rotavírus",
-        "triplice_viral_1": "Tríplice Viral - 1° Dose",
-        "triplice_viral_2": "Tríplice Viral - 2° Dose",
-        "varicela": "Varicela",
-    }
-
-    if vaccine_type in vaccine_mapping:
-        return get_vaccine_value(recorte, vaccine_mapping[vaccine_type])
+    if vaccine_type in VACCINE_MAPPING:
+        return get_vaccine_value(recorte, VACCINE_MAPPING[vaccine_type])
     return None
 
 
-def calculate_correlation_matrix(raw_data, selected_vaccine):
+def calculate_correlation_matrix(store, selected_vaccine):
     """Calculate correlation matrix for the selected vaccine across typologies"""
     try:
+        import pandas as pd
+
         # Prepare data for correlation analysis
         df_data = []
-        for item in raw_data:
-            if "recortes_2anos" in item and item["recortes_2anos"]:
-                recorte = item["recortes_2anos"][0]
-                coverage = get_vaccine_coverage_value(recorte, selected_vaccine)
-                if coverage is not None:
-                    population = float(
-                        str(item.get("Pop_Estimada_2024", "0"))
-                        .replace(".", "")
-                        .replace(",", "")
-                    )
-                    ubs_count = len(item.get("UBS", []))
-                    ubs_per_10k = (
-                        (ubs_count / population * 10000) if population > 0 else 0
-                    )
+        for row in store.rows_with_recorte():
+            coverage = store.get_coverage(selected_vaccine, row)
+            if coverage is not None:
+                population = store.get_population(row)
+                ubs_count = store.ubs_count[row]
+                ubs_per_10k = (ubs_count / population * 10000) if population > 0 else 0
 
-                    df_data.append(
-                        {
-                            "coverage": coverage,
-                            "population": population,
-                            "ubs_per_10k": ubs_per_10k,
-                            "typology": item.get("Tipo_2017", "Unknown"),
-                        }
-                    )
+                df_data.append(
+                    {
+                        "coverage": coverage,
+                        "population": population,
+                        "ubs_per_10k": ubs_per_10k,
+                        "typology": store.tipo[row] or "Unknown",
+                    }
+                )
 
         if not df_data:
             return {}
@@ -652,6 +1139,9 @@ def calculate_summaries(typology_groups, vaccine_types):
 
 def calculate_statistics(data_series):
     """Calculate basic statistical measures for a data series"""
+    import numpy as np
+    from scipy import stats
+
     if len(data_series) == 0:
         return {"mean": 0, "median": 0, "std": 0, "ci_lower": 0, "ci_upper": 0}
 
@@ -662,7 +1152,7 @@ def calculate_statistics(data_series):
     # Calculate 95% confidence interval
     ci = (
         stats.t.interval(
-            alpha=0.95, df=len(data_series) - 1, loc=mean, scale=stats.sem(data_series)
+            0.95, df=len(data_series) - 1, loc=mean, scale=stats.sem(data_series)
         )
         if len(data_series) > 1
         else (mean, mean)
@@ -677,27 +1167,23 @@ def calculate_statistics(data_series):
     }
 
 
-def analyze_coverage_trends(data, vaccine_type):
+def analyze_coverage_trends(store, vaccine_type):
     """Analyze coverage trends by typology"""
+    import pandas as pd
+
     df_data = []
-    for item in data:
-        if "recortes_2anos" in item and item["recortes_2anos"]:
-            recorte = item["recortes_2anos"][0]
-            coverage = get_vaccine_coverage_value(recorte, vaccine_type)
-            if coverage is not None:
-                df_data.append(
-                    {
-                        "coverage": coverage,
-                        "typology": item.get("Tipo_2017", "Unknown"),
-                        "region": item.get("Regiao", "Unknown"),
-                        "population": float(
-                            str(item.get("Pop_Estimada_2024", "0"))
-                            .replace(".", "")
-                            .replace(",", "")
-                        ),
-                        "ubs_count": len(item.get("UBS", [])),
-                    }
-                )
+    for row in store.rows_with_recorte():
+        coverage = store.get_coverage(vaccine_type, row)
+        if coverage is not None:
+            df_data.append(
+                {
+                    "coverage": coverage,
+                    "typology": store.tipo[row] or "Unknown",
+                    "region": store.regiao[row] or "Unknown",
+                    "population": store.get_population(row),
+                    "ubs_count": store.ubs_count[row],
+                }
+            )
 
     if not df_data:
         return {}
@@ -742,30 +1228,418 @@ def analyze_coverage_trends(data, vaccine_type):
     }
 
 
+def _finite_or_none(value, digits=None):
+    """Convert a numpy scalar to float, mapping NaN/inf to None"""
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    return round(value, digits) if digits is not None else value
+
+
+def compare_groups(samples, names, vaccines):
+    """Run ANOVA, Kruskal-Wallis and pairwise post-hoc tests for all vaccines.
+
+    Each sample is a (municipalities x vaccines) matrix for one group, with
+    NaN where the coverage is missing. Missing values are dropped per vaccine,
+    so ``groups`` reports how many municipalities each test actually used.
+    """
+    import numpy as np
+    from scipy import stats
+
+    results = {}
+    # Tukey-Kramer p-values for every vaccine are evaluated in one call
+    tukey_entries = []
+    tukey_args = []
+    for column, vaccine in enumerate(vaccines):
+        group_names = []
+        group_values = []
+        for name, sample in zip(names, samples):
+            values = sample[:, column]
+            values = values[~np.isnan(values)]
+            # Groups need at least two municipalities to have a variance
+            if len(values) >= 2:
+                group_names.append(name)
+                group_values.append(values)
+
+        result = {
+            "groups": {
+                name: len(values) for name, values in zip(group_names, group_values)
+            },
+            "sample_size": int(sum(len(values) for values in group_values)),
+            "anova": None,
+            "kruskal": None,
+            "pairwise": [],
+        }
+        results[vaccine] = result
+        if len(group_values) < 2:
+            continue
+
+        anova = stats.f_oneway(*group_values)
+        kruskal = stats.kruskal(*group_values)
+        result["anova"] = {
+            "statistic": _finite_or_none(anova.statistic, 4),
+            "p_value": _finite_or_none(anova.pvalue),
+        }
+        result["kruskal"] = {
+            "statistic": _finite_or_none(kruskal.statistic, 4),
+            "p_value": _finite_or_none(kruskal.pvalue),
+        }
+
+        # Tukey-Kramer HSD: studentized range of each pair of group means
+        k = len(group_values)
+        pairs = list(itertools.combinations(range(k), 2))
+        sizes = [len(values) for values in group_values]
+        means = [values.mean() for values in group_values]
+        df = sum(sizes) - k
+        mse = sum(((values - values.mean()) ** 2).sum() for values in group_values)
+        mse = mse / df
+
+        for a, b in pairs:
+            mean_difference = means[a] - means[b]
+            standard_error = math.sqrt(mse / 2 * (1 / sizes[a] + 1 / sizes[b]))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                q = abs(mean_difference) / standard_error
+            # Mann-Whitney U, Bonferroni corrected for the number of pairs
+            mannwhitney_p = stats.mannwhitneyu(group_values[a], group_values[b]).pvalue
+            entry = {
+                "group_a": group_names[a],
+                "group_b": group_names[b],
+                "mean_difference": _finite_or_none(mean_difference, 2),
+                "tukey_p_value": None,
+                "mannwhitney_p_value": _finite_or_none(
+                    min(mannwhitney_p * len(pairs), 1.0)
+                ),
+            }
+            result["pairwise"].append(entry)
+            tukey_entries.append(entry)
+            tukey_args.append((q, k, df))
+
+    if tukey_entries:
+        q, k, df = (np.array(column) for column in zip(*tukey_args))
+        tukey_p = stats.studentized_range.sf(q, k, df)
+        for entry, p_value in zip(tukey_entries, tukey_p):
+            entry["tukey_p_value"] = _finite_or_none(p_value)
+
+    return results
+
+
+def compute_group_tests(store):
+    """Test whether coverage differs between typologies and between regions"""
+    import numpy as np
+
+    vaccines = list(VACCINE_MAPPING)
+    rows = np.flatnonzero(np.frombuffer(store.has_recorte, dtype=np.int8))
+    coverage = np.column_stack(
+        [
+            np.where(
+                np.frombuffer(store.coverage_valid[vaccine], dtype=np.int8)[rows],
+                np.frombuffer(store.coverage[vaccine])[rows],
+                np.nan,
+            )
+            for vaccine in vaccines
+        ]
+    )
+
+    results = {vaccine: {} for vaccine in vaccines}
+    for view_type, labels, order in (
+        ("typology", store.tipo, TYPOLOGY_ORDER),
+        ("region", store.regiao, REGION_ORDER),
+    ):
+        row_labels = np.array([labels[row] for row in rows], dtype=object)
+        names = list(order)
+        samples = [coverage[row_labels == name] for name in names]
+
+        for vaccine, result in compare_groups(samples, names, vaccines).items():
+            results[vaccine][view_type] = result
+
+    return {"vaccines": results, "sample_size": int(len(rows))}
+
+
+@app.route("/api/group_tests")
+def get_group_tests():
+    """Endpoint for hypothesis tests comparing typologies and regions"""
+    try:
+        selected_vaccine = request.args.get("vaccine")
+
+        # Precomputed in the background after each data reload
+        test_results = get_group_test_results()
+
+        if selected_vaccine:
+            if selected_vaccine not in test_results["vaccines"]:
+                return (
+                    jsonify(
+                        create_response(None, f"Unknown vaccine: {selected_vaccine}")
+                    ),
+                    400,
+                )
+            test_results = {
+                "vaccines": {
+                    selected_vaccine: test_results["vaccines"][selected_vaccine]
+                },
+                "sample_size": test_results["sample_size"],
+            }
+
+        return jsonify(create_response(test_results))
+    except TimeoutError as e:
+        print(f"Timeout in group_tests: {e}")
+        return jsonify(create_response(None, str(e))), 503
+    except Exception as e:
+        print(f"Error in group_tests: {e}")
+        return jsonify(create_response(None, str(e))), 500
+
+
 @app.route("/api/coverage_analysis")
 def get_coverage_analysis():
     """Endpoint for detailed coverage analysis"""
     try:
         selected_vaccine = request.args.get("vaccine", "bcg")
 
-        # Load data
-        data_path = os.path.join(os.path.dirname(__file__), "output.json")
-
-        with open(data_path, "r", encoding="utf-8", errors="ignore") as file:
-            data = json.load(file)
+        error = validate_analysis_args(selected_vaccine)
+        if error:
+            return jsonify(create_response(None, error)), 400
 
-        # Perform analysis
-        analysis_results = analyze_coverage_trends(data, selected_vaccine)
+        # Perform analysis (shared by concurrent requests and cached per data version)
+        analysis_results = get_cached_result(
+            ("coverage_analysis", selected_vaccine),
+            lambda store: analyze_coverage_trends(store, selected_vaccine),
+        )
 
         return jsonify(
             create_response({"data": analysis_results, "vaccine": selected_vaccine})
         )
 
+    except TimeoutError as e:
+        print(f"Timeout in coverage_analysis: {e}")
+        return jsonify(create_response(None, str(e))), 503
     except Exception as e:
         print(f"Error in coverage_analysis: {e}")
         return jsonify(create_response(None, str(e))), 500
 
 
+CHART_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+CHART_MAX_AGE = int(os.getenv("CHART_MAX_AGE", str(7 * 24 * 60 * 60)))
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+# One full set of charts: 2 charts x 9 vaccine options x 2 views x 2 formats
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "72"))
+
+# Same color scale as the heatmap drawn by the dashboard
+COVERAGE_COLORS = [
+    (0.0, "#d73027"),  # < 70%
+    (0.7, "#fc8d59"),  # 70-80%
+    (0.8, "#fee08b"),  # 80-90%
+    (0.9, "#d9ef8b"),  # 90-100%
+    (1.0, "#91cf60"),  # > 100%
+]
+
+_render_pool = ThreadPoolExecutor(
+    max_workers=CHART_RENDER_WORKERS, thread_name_prefix="render"
+)
+
+# Rendered images get their own LRU so they never evict analytics results
+_chart_cache = ResultCache(CHART_CACHE_SIZE)
+
+_backend_lock = threading.Lock()
+_backend_selected = False
+
+
+def _select_backend():
+    """Switch matplotlib to the Agg backend once, before seaborn loads pyplot"""
+    global _backend_selected
+    with _backend_lock:
+        if not _backend_selected:
+            import matplotlib
+
+            matplotlib.use("Agg")
+            _backend_selected = True
+
+
+def _new_figure(width, height):
+    """Create a standalone matplotlib figure (no pyplot global state)"""
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=(width, height), dpi=100, layout="tight")
+
+
+def _vaccine_label(vaccine):
+    return "Todas as vacinas" if vaccine == "all" else VACCINE_MAPPING[vaccine]
+
+
+def render_typology_heatmap(store, selected_vaccine, view_type, image_format):
+    """Render the coverage matrix of /api/typology_matrix as a heatmap"""
+    import numpy as np
+    import seaborn as sns
+    from matplotlib.colors import LinearSegmentedColormap
+
+    # Shares the cache entry of /api/typology_matrix for this data version
+    matrix = get_cached_result(
+        ("typology_matrix", selected_vaccine, view_type),
+        lambda store: build_typology_matrix(store, selected_vaccine, view_type),
+        store=store,
+    )
+    categories = matrix["metadata"]["categories"]
+    vaccine_types = matrix["metadata"]["vaccine_types"]
+
+    values = np.full((len(categories), len(vaccine_types)), np.nan)
+    for entry in matrix["matrix_data"]:
+        values[
+            categories.index(entry["category"]),
+            vaccine_types.index(entry["vaccine_type"]),
+        ] = entry["coverage_rate"]
+
+    figure = _new_figure(2 + 1.3 * len(vaccine_types), 1.5 + 0.6 * len(categories))
+    ax = figure.subplots()
+    sns.heatmap(
+        values,
+        ax=ax,
+        annot=True,
+        fmt=".1f",
+        vmin=0,
+        vmax=100,
+        cmap=LinearSegmentedColormap.from_list("coverage", COVERAGE_COLORS),
+        xticklabels=[_vaccine_label(vaccine) for vaccine in vaccine_types],
+        yticklabels=categories,
+        cbar_kws={"label": "Cobertura (%)"},
+    )
+    ax.set_title(
+        "Matriz de Cobertura Vacinal por Tipologia Municipal"
+        if view_type == "typology"
+        else "Matriz de Cobertura Vacinal por Região"
+    )
+    ax.set_xlabel("Vacinas")
+    ax.set_ylabel("Tipologia Municipal" if view_type == "typology" else "Região")
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    ax.tick_params(axis="y", labelrotation=0)
+    return _save_figure(figure, image_format)
+
+
+def render_coverage_histogram(store, selected_vaccine, view_type, image_format):
+    """Render the distribution of municipal coverage, stacked by category"""
+    import numpy as np
+    import seaborn as sns
+
+    rows = np.flatnonzero(np.frombuffer(store.has_recorte, dtype=np.int8))
+    if selected_vaccine == "all":
+        coverage = np.mean(
+            [np.frombuffer(store.coverage[v])[rows] for v in VACCINE_MAPPING], axis=0
+        )
+    else:
+        coverage = np.frombuffer(store.coverage[selected_vaccine])[rows]
+
+    labels = store.tipo if view_type == "typology" else store.regiao
+    order = TYPOLOGY_ORDER if view_type == "typology" else REGION_ORDER
+    categories = np.array([labels[row] for row in rows], dtype=object)
+    selected = np.isin(categories, order)
+
+    figure = _new_figure(9, 5)
+    ax = figure.subplots()
+    sns.histplot(
+        x=coverage[selected],
+        hue=categories[selected],
+        hue_order=[category for category in order if category in categories],
+        multiple="stack",
+        bins=30,
+        ax=ax,
+    )
+    ax.set_title(
+        f"Distribuição da Cobertura Vacinal - {_vaccine_label(selected_vaccine)}"
+    )
+    ax.set_xlabel("Cobertura (%)")
+    ax.set_ylabel("Municípios")
+    return _save_figure(figure, image_format)
+
+
+def _save_figure(figure, image_format):
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+CHART_RENDERERS = {
+    "typology_heatmap": render_typology_heatmap,
+    "coverage_histogram": render_coverage_histogram,
+}
+
+
+def render_chart(store, chart, selected_vaccine, view_type, image_format):
+    """Render a chart on the render pool and return it with its cache metadata"""
+    _select_backend()
+    image = _render_pool.submit(
+        CHART_RENDERERS[chart], store, selected_vaccine, view_type, image_format
+    ).result()
+    mtime_ns, size = store.version
+    return {
+        "image": image,
+        "etag": hashlib.sha1(image).hexdigest(),
+        "last_modified": mtime_ns / 1e9,
+        "version": f"{mtime_ns:x}-{size:x}",
+    }
+
+
+@app.route("/api/charts/<chart>")
+def get_chart(chart):
+    """Endpoint for server-side rendered chart images.
+
+    Images are only cached long-term by clients when the URL carries the
+    data version (``v``) they were rendered from; unversioned URLs must be
+    revalidated with the ETag and point to the versioned URL through the
+    Content-Location header.
+    """
+    try:
+        selected_vaccine = request.args.get("vaccine", "bcg")
+        view_type = request.args.get("view", "typology")  # 'typology' or 'region'
+        image_format = request.args.get("format", "png")
+
+        if chart not in CHART_RENDERERS:
+            return jsonify(create_response(None, f"Unknown chart: {chart}")), 404
+        error = validate_analysis_args(selected_vaccine, view_type)
+        if error:
+            return jsonify(create_response(None, error)), 400
+        if image_format not in CHART_FORMATS:
+            return (
+                jsonify(create_response(None, f"Unknown format: {image_format}")),
+                400,
+            )
+
+        # Rendered once per data version, then served from the result cache
+        rendered = get_cached_result(
+            ("chart", chart, selected_vaccine, view_type, image_format),
+            lambda store: render_chart(
+                store, chart, selected_vaccine, view_type, image_format
+            ),
+            _chart_cache,
+        )
+
+        response = app.response_class(
+            rendered["image"], mimetype=CHART_FORMATS[image_format]
+        )
+        response.set_etag(rendered["etag"])
+        response.last_modified = rendered["last_modified"]
+        response.cache_control.public = True
+        if request.args.get("v") == rendered["version"]:
+            # The URL names this exact data version, so it never changes
+            response.cache_control.max_age = CHART_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+            response.headers["Content-Location"] = url_for(
+                "get_chart",
+                chart=chart,
+                vaccine=selected_vaccine,
+                view=view_type,
+                format=image_format,
+                v=rendered["version"],
+            )
+        return response.make_conditional(request)
+    except TimeoutError as e:
+        print(f"Timeout in chart: {e}")
+        return jsonify(create_response(None, str(e))), 503
+    except Exception as e:
+        print(f"Error in chart: {e}")
+        return jsonify(create_response(None, str(e))), 500
+
+
 def get_latitude(item):
     """Extract latitude from the first UBS in the item"""
     if "UBS" in item and item["UBS"]: